@@ -1,6 +1,15 @@
 from binaryninja import InstructionTextToken, InstructionTextTokenType
+import array
+import bisect
+import collections
+import enum
+import functools
 import struct
 
+# Instruction words and their immediates are little endian 16-bit values.
+WordFormat = struct.Struct('<H')
+TwoWordFormat = struct.Struct('<HH')
+
 # Type 1 instructions are those that take two operands.
 TYPE1_INSTRUCTIONS = [
     'mov', 'add', 'addc', 'subc', 'sub', 'cmp',
@@ -21,52 +30,71 @@ TYPE3_INSTRUCTIONS = [
     'jmp'
 ]
 
-InstructionNames = [
+# Every mnemonic the decoder can produce, including the emulated
+# instructions. Decoded instructions carry the index of their
+# mnemonic as a MnemonicId.
+Mnemonics = tuple(
+    TYPE1_INSTRUCTIONS +
+    TYPE2_INSTRUCTIONS +
+    TYPE3_INSTRUCTIONS +
+    ['ret', 'dint', 'hlt']
+)
+
+MnemonicId = enum.IntEnum(
+    'MnemonicId', [mnemonic.upper() for mnemonic in Mnemonics], start=0)
+
+# InstructionNames is indexed by the opcode (top four bits) and
+# then by the bits selected with InstructionMask and
+# InstructionMaskShift.
+InstructionNames = (
     # No instructions use opcode 0
-    None,
+    (None,),
 
     # Type 2 instructions all start with 0x1 but then
     # differentiate by three more bits:
     # 0001 00 XXX .......
-    ['rrc', 'swpb', 'rra', 'sxt', 'push', 'call', 'reti'],
+    ('rrc', 'swpb', 'rra', 'sxt', 'push', 'call', 'reti', None),
 
     # Type 3 instructions start with either 0x2 or 0x3 and
     # then differentiate with the following three bits:
     # 0010 XXX ..........
-    ['jnz', 'jz', 'jlo', 'jhs'],
+    ('jnz', 'jz', 'jlo', 'jhs'),
     # 0011 XXX ..........
-    ['jn', 'jge', 'jl', 'jmp'],
+    ('jn', 'jge', 'jl', 'jmp'),
 
     # Type 1 instructions all use the top 4 bits
     # for their opcodes (0x4 - 0xf)
-    'mov',
-    'add',
-    'addc',
-    'subc',
-    'sub',
-    'cmp',
-    'dadd',
-    'bit',
-    'bic',
-    'bis',
-    'xor',
-    'and'
-]
+    ('mov',),
+    ('add',),
+    ('addc',),
+    ('subc',),
+    ('sub',),
+    ('cmp',),
+    ('dadd',),
+    ('bit',),
+    ('bic',),
+    ('bis',),
+    ('xor',),
+    ('and',)
+)
 
 # InstructionMask and InstructionMaskShift are used to mask
 # off the bits that are used for the opcode of type 2 and 3
-# instructions.
-InstructionMask = {
-    1: 0x380,
-    2: 0xc00,
-    3: 0xc00,
-}
-
-InstructionMaskShift = {
-    1: 7,
-    2: 10,
-    3: 10
-}
+# instructions. Type 1 instructions select their only name
+# with a mask of 0.
+InstructionMask = (
+    0,
+    0x380,
+    0xc00, 0xc00,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
+)
+
+InstructionMaskShift = (
+    0,
+    7,
+    10, 10,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
+)
 
 # Some instructions can be either 2 byte (word) or 1 byte
 # operations.
@@ -126,32 +154,79 @@ Registers = [
     'r15'
 ]
 
+# Operand targets are always taken from Registers, so the special
+# registers can be checked by identity.
+PC = Registers[0]
+SR = Registers[2]
+
+# Source operands using pc, sr or cg as the register give some of the
+# addressing modes a different meaning. SourceModes maps a register
+# index and addressing mode to the effective operand mode.
+GeneralSourceModes = (
+    REGISTER_MODE,
+    INDEXED_MODE,
+    INDIRECT_REGISTER_MODE,
+    INDIRECT_AUTOINCREMENT_MODE
+)
+
+SourceModes = (
+    # pc
+    (REGISTER_MODE, SYMBOLIC_MODE, INDIRECT_REGISTER_MODE, IMMEDIATE_MODE),
+    # sp
+    GeneralSourceModes,
+    # sr
+    (REGISTER_MODE, ABSOLUTE_MODE, CONSTANT_MODE4, CONSTANT_MODE8),
+    # cg
+    (CONSTANT_MODE0, CONSTANT_MODE1, CONSTANT_MODE2, CONSTANT_MODE_NEG1),
+) + (GeneralSourceModes,) * 12
+
+SourceOperandLengths = tuple(
+    tuple(OperandLengths[mode] for mode in modes)
+    for modes in SourceModes
+)
+
+# Punctuation and register tokens never change, so the operand tokens
+# share a single instance of each.
+LeftParenToken = InstructionTextToken(InstructionTextTokenType.TextToken, '(')
+RightParenToken = InstructionTextToken(InstructionTextTokenType.TextToken, ')')
+IndirectToken = InstructionTextToken(InstructionTextTokenType.TextToken, '@')
+AutoincrementToken = InstructionTextToken(
+    InstructionTextTokenType.TextToken, '+')
+AbsoluteToken = InstructionTextToken(InstructionTextTokenType.TextToken, '&')
+SeparatorToken = InstructionTextToken(InstructionTextTokenType.TextToken, ',')
+
+RegisterTokens = {
+    register: InstructionTextToken(
+        InstructionTextTokenType.RegisterToken, register)
+    for register in Registers
+}
+
 OperandTokens = [
     lambda reg, value: [    # REGISTER_MODE
-        InstructionTextToken(InstructionTextTokenType.RegisterToken, reg)
+        RegisterTokens[reg]
     ],
     lambda reg, value: [    # INDEXED_MODE
         InstructionTextToken(
             InstructionTextTokenType.IntegerToken, hex(value), value),
-        InstructionTextToken(InstructionTextTokenType.TextToken, '('),
-        InstructionTextToken(InstructionTextTokenType.RegisterToken, reg),
-        InstructionTextToken(InstructionTextTokenType.TextToken, ')')
+        LeftParenToken,
+        RegisterTokens[reg],
+        RightParenToken
     ],
     lambda reg, value: [    # INDIRECT_REGISTER_MODE
-        InstructionTextToken(InstructionTextTokenType.TextToken, '@'),
-        InstructionTextToken(InstructionTextTokenType.RegisterToken, reg)
+        IndirectToken,
+        RegisterTokens[reg]
     ],
     lambda reg, value: [    # INDIRECT_AUTOINCREMENT_MODE
-        InstructionTextToken(InstructionTextTokenType.TextToken, '@'),
-        InstructionTextToken(InstructionTextTokenType.RegisterToken, reg),
-        InstructionTextToken(InstructionTextTokenType.TextToken, '+')
+        IndirectToken,
+        RegisterTokens[reg],
+        AutoincrementToken
     ],
     lambda reg, value: [    # SYMBOLIC_MODE
         InstructionTextToken(
             InstructionTextTokenType.CodeRelativeAddressToken, hex(value), value)
     ],
     lambda reg, value: [    # ABSOLUTE_MODE
-        InstructionTextToken(InstructionTextTokenType.TextToken, '&'),
+        AbsoluteToken,
         InstructionTextToken(
             InstructionTextTokenType.PossibleAddressToken, hex(value), value)
     ],
@@ -184,234 +259,451 @@ OperandTokens = [
     ]
 ]
 
+# Tokens for operands that do not carry a value only depend on the
+# mode and register, so they are built once and shared.
+ConstantOperandTokens = {
+    mode: OperandTokens[mode](None, None)
+    for mode in (
+        CONSTANT_MODE0,
+        CONSTANT_MODE1,
+        CONSTANT_MODE2,
+        CONSTANT_MODE4,
+        CONSTANT_MODE8,
+        CONSTANT_MODE_NEG1
+    )
+}
 
-class Operand:
-    def __init__(
-        self,
-        mode,
-        target=None,
-        width=None,
-        value=None,
-        operand_length=0
-    ):
-        self._mode = mode
-        self._width = width
-        self._target = target
-        self._value = value
-        self._length = operand_length
+RegisterOperandModes = (
+    REGISTER_MODE,
+    INDIRECT_REGISTER_MODE,
+    INDIRECT_AUTOINCREMENT_MODE
+)
 
-    @property
-    def mode(self):
-        return self._mode
-    
-    @property
-    def width(self):
-        return self._width
+RegisterOperandTokens = {}
 
-    @property
-    def target(self):
-        return self._target
 
-    @property
-    def value(self):
-        return self._value
+def operand_tokens(operand):
+    mode = operand.mode
 
-    @value.setter
-    def value(self, v):
-        self._value = v
+    if mode in ConstantOperandTokens:
+        return ConstantOperandTokens[mode]
 
-    @property
-    def operand_length(self):
-        return self._length
+    if mode in RegisterOperandModes:
+        key = (mode, operand.target)
+        tokens = RegisterOperandTokens.get(key)
+        if tokens is None:
+            tokens = OperandTokens[mode](operand.target, None)
+            RegisterOperandTokens[key] = tokens
+        return tokens
 
-class SourceOperand(Operand):
-    @classmethod
-    def decode(cls, instr_type, instruction, address):
-        if instr_type == 3:
-            mode = OFFSET
-            target = None
-            width = None
-        else:
-            width = 1 if (instruction & 0x40) >> 6 else 2
-
-            # As is in the same place for Type 1 and 2 instructions
-            mode = (instruction & 0x30) >> 4
-
-        if instr_type == 2:
-            target = Registers[instruction & 0xf]
-        elif instr_type == 1:
-            target = Registers[(instruction & 0xf00) >> 8]
-        
-        if target == 'pc':
-            if mode == INDEXED_MODE:
-                mode = SYMBOLIC_MODE
-            elif mode == INDIRECT_AUTOINCREMENT_MODE:
-                mode = IMMEDIATE_MODE
-        elif target == 'cg':
-            if mode == REGISTER_MODE:
-                mode = CONSTANT_MODE0
-            elif mode == INDEXED_MODE:
-                mode = CONSTANT_MODE1
-            elif mode == INDIRECT_REGISTER_MODE:
-                mode = CONSTANT_MODE2
-            else:
-                mode = CONSTANT_MODE_NEG1
-        elif target == 'sr':
-            if mode == INDEXED_MODE:
-                mode = ABSOLUTE_MODE
-            elif mode == INDIRECT_REGISTER_MODE:
-                mode = CONSTANT_MODE4
-            elif mode == INDIRECT_AUTOINCREMENT_MODE:
-                mode = CONSTANT_MODE8
-
-        operand_length = OperandLengths[mode]
-
-        if instr_type == 3:
-            branch_target = (instruction & 0x3ff) << 1
-
-            # check if it's a negative offset
-            if branch_target & 0x600:
-                branch_target |= 0xf800
-                branch_target -= 0x10000
-
-            value = address + 2 + branch_target
-
-            return cls(mode, target, width, value, operand_length)
-        else:
-            return cls(mode, target, width, operand_length=operand_length)
+    return OperandTokens[mode](operand.target, operand.value)
 
-class DestOperand(Operand):
-    @classmethod
-    def decode(cls, instr_type, instruction, address):
-        if instr_type != 1:
-            return None
 
-        width = 1 if (instruction & 0x40) >> 6 else 2
-        target = Registers[instruction & 0xf]
-        mode = (instruction & 0x80) >> 7
+# Mnemonic tokens, indexed by MnemonicId and then by whether the
+# instruction is a byte (.b) operation.
+MnemonicTokens = tuple(
+    (
+        InstructionTextToken(
+            InstructionTextTokenType.TextToken, '{:7s}'.format(mnemonic)),
+        InstructionTextToken(
+            InstructionTextTokenType.TextToken, '{:7s}'.format(mnemonic + '.b'))
+    )
+    for mnemonic in Mnemonics
+)
+
 
-        if target == 'sr' and mode == INDEXED_MODE:
-                mode = ABSOLUTE_MODE
+# Operands are immutable once decoded. value holds the immediate or
+# branch target for the modes that have one.
+Operand = collections.namedtuple(
+    'Operand',
+    ('mode', 'target', 'width', 'value', 'operand_length'),
+    defaults=(None, None, None, 0)
+)
 
-        operand_length = OperandLengths[mode]
 
-        return cls(mode, target, width, operand_length=operand_length)
+def decode_source_operand(register, mode, width):
+    return Operand(
+        SourceModes[register][mode],
+        Registers[register],
+        width,
+        None,
+        SourceOperandLengths[register][mode]
+    )
 
-class Instruction:
-    @classmethod
-    def decode(cls, data, address):
-        if len(data) < 2:
-            return None
 
-        emulated = False
+def decode_offset_operand(instruction, address):
+    # The offset is a signed 10-bit word count.
+    branch_target = (((instruction & 0x3ff) ^ 0x200) - 0x200) << 1
 
-        instruction = struct.unpack('<H', data[0:2])[0]
+    value = address + 2 + branch_target
 
-        # emulated instructions
-        if instruction == 0x4130:
-            return cls('ret', emulated=True)
+    return Operand(OFFSET, None, None, value, OperandLengths[OFFSET])
 
-        opcode = (instruction & 0xf000) >> 12
 
-        mask = InstructionMask.get(opcode)
-        shift = InstructionMaskShift.get(opcode)
+def decode_dest_operand(register, mode, width):
+    target = Registers[register]
 
-        if None not in (mask, shift):
-            mnemonic = InstructionNames[opcode][(instruction & mask) >> shift]
-        else:
-            mnemonic = InstructionNames[opcode]
+    if target is SR and mode == INDEXED_MODE:
+        mode = ABSOLUTE_MODE
 
-        if mnemonic is None:
-            return None
+    return Operand(mode, target, width, None, OperandLengths[mode])
 
-        if mnemonic in TYPE1_INSTRUCTIONS:
-            type_ = 1
-        elif mnemonic in TYPE2_INSTRUCTIONS:
-            type_ = 2
-        elif mnemonic in TYPE3_INSTRUCTIONS:
-            type_ = 3
 
-        src = SourceOperand.decode(type_, instruction, address)
+# Binary Ninja decodes the same address for the instruction info,
+# text and IL, so decoded instructions are cached and shared.
+# Instructions are therefore immutable; build a new one instead of
+# modifying a decoded instruction.
+class Instruction(collections.namedtuple(
+    'Instruction',
+    ('mnemonic_id', 'type', 'src', 'dst', 'length', 'emulated'),
+    defaults=(None, None, None, 2, False)
+)):
+    __slots__ = ()
 
-        dst = DestOperand.decode(type_, instruction, address)
+    @classmethod
+    def decode(cls, data, address):
+        return decode_instruction(
+            bytes(data[:MAX_INSTRUCTION_LENGTH]), address)
 
-        length = 2 + src.operand_length + (dst.operand_length if dst else 0)
+    @classmethod
+    def decode_at(cls, data, offset, address):
+        # Decodes the instruction at offset in data without slicing or
+        # copying it, for callers walking a whole section through one
+        # memoryview. These instructions are not cached.
+        instruction = decode_relative(data, offset)
 
-        if len(data) < length:
+        if instruction is None:
             return None
 
-        offset = 2
-        if src.operand_length:
-            src.value = struct.unpack('<H', data[offset:offset+2])[0]
-            offset += 2
-        if dst and dst.operand_length:
-            dst.value = struct.unpack('<H', data[offset:offset+2])[0]
-
-        # emulated instructions
-        if mnemonic == 'mov' and dst.target == 'pc':
-            mnemonic = 'br'
-            emulated = True
-
-        elif (
-            mnemonic == 'bis' and
-            dst.target == 'sr' and
-            src.value == 0xf0
-        ):
-            return cls('dint', length=length, emulated=True)
-
-        return cls(
-            mnemonic,
-            type_,
-            src,
-            dst,
-            length,
-            emulated
+        return instruction.at_address(address)
+
+    @classmethod
+    def decode_many(cls, data, base_address):
+        return DecodedSection(data, base_address)
+
+    def at_address(self, address):
+        # DecodeTable and decode_relative keep the branch target of a
+        # type 3 instruction relative to the instruction address.
+        if self.type != 3:
+            return self
+
+        src = self.src
+
+        return Instruction(
+            self.mnemonic_id,
+            3,
+            Operand(OFFSET, None, None, src.value + address, src.operand_length),
+            None,
+            self.length,
+            self.emulated
         )
 
     def generate_tokens(self):
-        tokens = []
-
-        mnemonic = self.mnemonic
         type_ = self.type
         src = self.src
         dst = self.dst
 
-        if src is not None and src.width == 1:
-            mnemonic += '.b'
-
         tokens = [
-            InstructionTextToken(
-                InstructionTextTokenType.TextToken, '{:7s}'.format(mnemonic))
+            MnemonicTokens[self.mnemonic_id][
+                src is not None and src.width == 1]
         ]
 
         if type_ == 1:
-            tokens += OperandTokens[src.mode](src.target, src.value)
+            tokens += operand_tokens(src)
 
-            tokens += [InstructionTextToken(
-                InstructionTextTokenType.TextToken, ',')]
+            tokens.append(SeparatorToken)
 
-            tokens += OperandTokens[dst.mode](dst.target, dst.value)
+            tokens += operand_tokens(dst)
 
         elif type_ == 2:
-            tokens += OperandTokens[src.mode](src.target, src.value)
+            tokens += operand_tokens(src)
 
         elif type_ == 3:
-            tokens += OperandTokens[src.mode](src.target, src.value)
+            tokens += operand_tokens(src)
 
         return tokens
 
-    def __init__(
-        self,
-        mnemonic,
-        type_=None,
-        src=None,
-        dst=None,
-        length=2,
-        emulated=False
+    @property
+    def mnemonic(self):
+        return Mnemonics[self.mnemonic_id]
+
+    def __repr__(self):
+        return (
+            f'{type(self).__name__}(mnemonic={self.mnemonic!r}, '
+            f'type={self.type}, src={self.src}, dst={self.dst}, '
+            f'length={self.length}, emulated={self.emulated})'
+        )
+
+
+def decode_type1_word(instruction, opcode):
+    # The width bit and the source addressing mode are in the same
+    # place for type 1 and 2 instructions.
+    width = 2 - ((instruction >> 6) & 1)
+
+    src = decode_source_operand(
+        (instruction >> 8) & 0xf, (instruction >> 4) & 0x3, width)
+
+    dst = decode_dest_operand(instruction & 0xf, (instruction >> 7) & 0x1, width)
+
+    mnemonic_id = MnemonicId[InstructionNames[opcode][0].upper()]
+    emulated = False
+
+    # emulated instructions
+    if mnemonic_id == MnemonicId.MOV and dst.target is PC:
+        mnemonic_id = MnemonicId.BR
+        emulated = True
+
+    return Instruction(
+        mnemonic_id,
+        1,
+        src,
+        dst,
+        2 + src.operand_length + dst.operand_length,
+        emulated
+    )
+
+
+def decode_type2_word(instruction, opcode):
+    mnemonic = InstructionNames[opcode][
+        (instruction & InstructionMask[opcode]) >> InstructionMaskShift[opcode]
+    ]
+
+    if mnemonic is None:
+        return None
+
+    width = 2 - ((instruction >> 6) & 1)
+
+    src = decode_source_operand(instruction & 0xf, (instruction >> 4) & 0x3, width)
+
+    return Instruction(
+        MnemonicId[mnemonic.upper()], 2, src, None, 2 + src.operand_length)
+
+
+def decode_type3_word(instruction, opcode):
+    mnemonic = InstructionNames[opcode][
+        (instruction & InstructionMask[opcode]) >> InstructionMaskShift[opcode]
+    ]
+
+    # Decoding at address 0 makes the branch target relative to the
+    # address of the instruction.
+    src = decode_offset_operand(instruction, 0)
+
+    return Instruction(MnemonicId[mnemonic.upper()], 3, src, None, 2)
+
+
+def decode_word(instruction):
+    # Decodes everything that is determined by the first instruction
+    # word alone. Operands that take an immediate are left with a value
+    # of None and filled in by decode_relative.
+
+    # emulated instructions
+    if instruction == 0x4130:
+        return Instruction(MnemonicId.RET, emulated=True)
+
+    opcode = instruction >> 12
+
+    if opcode >= 4:
+        return decode_type1_word(instruction, opcode)
+    elif opcode >= 2:
+        return decode_type3_word(instruction, opcode)
+    elif opcode == 1:
+        return decode_type2_word(instruction, opcode)
+
+    return None
+
+
+# The first instruction word fully determines the mnemonic, type and
+# operand modes, so every possible word is decoded once up front. The
+# entries are themselves instructions: those without immediates are
+# returned as they are, and type 3 branch targets are relative to the
+# instruction address.
+DecodeTable = tuple(decode_word(instruction) for instruction in range(0x10000))
+
+
+# The longest instruction is a word followed by two immediates.
+MAX_INSTRUCTION_LENGTH = 6
+
+
+def decode_relative(data, offset):
+    # Decodes the instruction at offset in data, which can be any
+    # buffer (bytes, memoryview, ...). Words are unpacked in place, so
+    # no slices of data are made. Type 3 branch targets are left
+    # relative to the instruction address (see Instruction.at_address).
+    available = len(data) - offset
+
+    if available < 2:
+        return None
+
+    entry = DecodeTable[WordFormat.unpack_from(data, offset)[0]]
+
+    # Truncated instructions are rejected before any operand fields
+    # are read.
+    if entry is None or available < entry.length:
+        return None
+
+    if entry.length == 2:
+        return entry
+
+    mnemonic_id, type_, src, dst, length, emulated = entry
+
+    # Only type 1 and 2 instructions reach this point, and at least one
+    # of their operands takes an immediate.
+    if dst is not None and dst.operand_length:
+        if src.operand_length:
+            src_value, dst_value = TwoWordFormat.unpack_from(data, offset + 2)
+            src = Operand(
+                src.mode, src.target, src.width, src_value, src.operand_length)
+        else:
+            dst_value = WordFormat.unpack_from(data, offset + 2)[0]
+
+        dst = Operand(
+            dst.mode, dst.target, dst.width, dst_value, dst.operand_length)
+    else:
+        src = Operand(
+            src.mode,
+            src.target,
+            src.width,
+            WordFormat.unpack_from(data, offset + 2)[0],
+            src.operand_length
+        )
+
+    # dint depends on the immediate, so it is the only emulated
+    # instruction that DecodeTable cannot resolve.
+    if (
+        mnemonic_id == MnemonicId.BIS and
+        dst.target is SR and
+        src.value == 0xf0
     ):
-        self.mnemonic = mnemonic
-        self.src = src
-        self.dst = dst
-        self.length = length
-        self.emulated = emulated
-        self.type = type_
+        return Instruction(MnemonicId.DINT, length=length, emulated=True)
+
+    return Instruction(mnemonic_id, type_, src, dst, length, emulated)
+
+
+# NO_VALUE marks fields of decode_section columns that the
+# instruction does not have.
+NO_VALUE = -1
+
+RegisterIndices = {register: index for index, register in enumerate(Registers)}
+
+
+def decode_section(data, base_address):
+    # Linear sweep over a whole code section, producing one column per
+    # decoded field. Words that do not decode to an instruction are
+    # skipped.
+    view = memoryview(data)
+
+    addresses = array.array('L')
+    lengths = array.array('B')
+    mnemonic_ids = array.array('B')
+    types = array.array('B')
+    src_modes = array.array('b')
+    src_targets = array.array('b')
+    src_values = array.array('l')
+    dst_modes = array.array('b')
+    dst_targets = array.array('b')
+    dst_values = array.array('l')
+
+    offset = 0
+    end = len(view) - 1
+
+    while offset < end:
+        instruction = decode_relative(view, offset)
+
+        if instruction is None:
+            offset += 2
+            continue
+
+        address = base_address + offset
+        type_ = instruction.type
+        src = instruction.src
+        dst = instruction.dst
+
+        addresses.append(address)
+        lengths.append(instruction.length)
+        mnemonic_ids.append(instruction.mnemonic_id)
+        types.append(type_ or 0)
+
+        if src is None:
+            src_modes.append(NO_VALUE)
+            src_targets.append(NO_VALUE)
+            src_values.append(NO_VALUE)
+        else:
+            src_value = src.value
+            if type_ == 3:
+                src_value += address
+
+            src_modes.append(src.mode)
+            src_targets.append(RegisterIndices.get(src.target, NO_VALUE))
+            src_values.append(NO_VALUE if src_value is None else src_value)
+
+        if dst is None:
+            dst_modes.append(NO_VALUE)
+            dst_targets.append(NO_VALUE)
+            dst_values.append(NO_VALUE)
+        else:
+            dst_modes.append(dst.mode)
+            dst_targets.append(RegisterIndices.get(dst.target, NO_VALUE))
+            dst_values.append(NO_VALUE if dst.value is None else dst.value)
+
+        offset += instruction.length
+
+    return (
+        addresses, lengths, mnemonic_ids, types,
+        src_modes, src_targets, src_values,
+        dst_modes, dst_targets, dst_values
+    )
+
+
+class DecodedSection:
+    # The decoded fields of a whole code section, stored as one column
+    # per field so that passes which only need a few fields (such as
+    # addresses and lengths) read contiguous arrays. Instruction
+    # objects are only built on indexing or iteration.
+    def __init__(self, data, base_address):
+        self.data = memoryview(data)
+        self.base_address = base_address
+
+        (
+            self.addresses, self.lengths, self.mnemonic_ids, self.types,
+            self.src_modes, self.src_targets, self.src_values,
+            self.dst_modes, self.dst_targets, self.dst_values
+        ) = decode_section(self.data, base_address)
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        address = self.addresses[index]
+
+        return Instruction.decode_at(
+            self.data, address - self.base_address, address)
+
+    def __iter__(self):
+        for index in range(len(self.addresses)):
+            yield self[index]
+
+    def index_of(self, address):
+        # Returns the index of the instruction starting at address, or
+        # None if no decoded instruction starts there.
+        index = bisect.bisect_left(self.addresses, address)
+
+        if index < len(self.addresses) and self.addresses[index] == address:
+            return index
+
+        return None
+
+    def length_at(self, address):
+        index = self.index_of(address)
+
+        if index is None:
+            return None
+
+        return self.lengths[index]
+
+
+@functools.lru_cache(maxsize=8192)
+def decode_instruction(data, address):
+    return Instruction.decode_at(data, 0, address)
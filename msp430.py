@@ -7,7 +7,7 @@ from binaryninja import (
     RegisterInfo,
 )
 
-from .instructions import TYPE3_INSTRUCTIONS, Instruction, Registers
+from .instructions import TYPE3_INSTRUCTIONS, Instruction, MnemonicId, Registers
 from .lifter import Lifter
 
 
@@ -94,7 +94,7 @@ class MSP430(Architecture):
         if instr.mnemonic == "dint":
             next_instr = Instruction.decode(data[instr.length :], addr + instr.length)
             if next_instr.mnemonic == "jmp" and next_instr.src.value == addr:
-                instr.mnemonic = "hlt"
+                instr = Instruction(MnemonicId.HLT, length=instr.length, emulated=True)
 
         Lifter.lift(il, instr)
 